@@ -24,12 +24,26 @@ and intelligently merges multiple remote files into consolidated local files.
 """
 
 import argparse
+import hashlib
+import io
+import json
 import os
 import re
 import sys
-from typing import Dict, List, Set, Tuple
-from urllib.request import urlopen
-from urllib.error import URLError
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from http.client import HTTPConnection, HTTPException, HTTPMessage, HTTPSConnection
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, TextIO, Tuple
+from urllib.parse import urljoin, urlsplit
+from urllib.request import Request, getproxies, urlopen
+from urllib.error import HTTPError, URLError
+
+# google-re2 (optional) guarantees linear-time matching for the per-line patterns
+try:
+    import re2 as line_re
+except ImportError:
+    line_re = re
 
 # ANSI color codes for terminal output
 class Colors:
@@ -112,42 +126,343 @@ SKIP_PATTERNS = {
     ],
 }
 
+def _literals_alternation(patterns: List[str]) -> str:
+    """Build a regex alternation of literal strings (never matches if empty)."""
+    # An empty character class never matches and, unlike a lookahead, is valid in RE2 too
+    return '|'.join(re.escape(pattern) for pattern in patterns) or r'[^\s\S]'
+
+
+def _compile_literals(patterns: List[str]) -> re.Pattern:
+    """Compile literal strings into a single alternation regex."""
+    return re.compile(f'(?:{_literals_alternation(patterns)})')
+
+
+# Pre-compiled patterns used while parsing proto files
+# Classifies a stripped line by its leading keyword with one match; the group name is
+# the line kind. Alternatives are tried in the same order as the parser's checks.
+_LINE_CLASSIFIER = line_re.compile(
+    r'(?P<syntax>syntax =)'
+    r'|(?P<java_package>option java_package)'
+    rf'|(?P<skip_prefix>{_literals_alternation(SKIP_PATTERNS["line_prefixes"])})'
+    r'|(?P<package>package )'
+    r'|(?P<import>import )'
+)
+# The substring lists are matched with a single regex scan per line
+_SKIP_CONTAINS_RE = _compile_literals(SKIP_PATTERNS['line_contains'])
+_OPTION_BLOCK_RE = _compile_literals(SKIP_PATTERNS['option_blocks'])
+_SKIP_IMPORT_RE = _compile_literals(SKIP_PATTERNS['import_contains'])
+_MESSAGE_RE = re.compile(r'message\s+(\w+)')
+_RPC_RE = re.compile(r'rpc\s+(\w+)')
+# Matches banyandb/{module}/v1/{file}.proto import paths, capturing the module name
+_IMPORT_PATH_RE = line_re.compile(r'banyandb/([^/]+)/v1/[^"]+\.proto')
+
 # GitHub repository configuration
 GITHUB_REPO = "apache/skywalking-banyandb"
 GITHUB_RAW_BASE = "https://raw.githubusercontent.com"
 REMOTE_PROTO_PATH = "api/proto/banyandb"
 
+# Upper bound on concurrent HTTP requests to GitHub (keeps us clear of rate limits)
+MAX_FETCH_WORKERS = 8
+
+# HTTP connections are kept alive and reused per worker thread and host, so TCP and TLS
+# handshakes are paid once per connection instead of once per request
+HTTP_TIMEOUT = 30
+HTTP_USER_AGENT = 'skywalking-banyandb-client-proto-sync'
+HTTP_MAX_REDIRECTS = 5
+_http_connections = threading.local()
+
+# Remote proto file listings: maps branch -> (listing, error), see fetch_proto_tree
+_proto_trees: Dict[str, Tuple[Optional[Dict[str, List[str]]], Optional[Exception]]] = {}
+_proto_trees_lock = threading.Lock()
+
+# HTTP cache: maps URL -> {'etag': ..., 'body': ...}, persisted between runs so that
+# unchanged upstream files are revalidated with If-None-Match instead of re-downloaded
+HTTP_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.proto_sync_cache.json')
+_http_cache: Dict[str, Dict[str, str]] = {}
+_http_cache_lock = threading.Lock()
+
+# Output checksums: maps output path -> {'sha256', 'size', 'mtime_ns'} of the merged file
+# last written (or found up to date). When the merged content hashes to the same value
+# and the file on disk is unmodified, the file does not have to be read and compared.
+CHECKSUMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.proto_sync_checksums.json')
+_output_checksums: Dict[str, Dict] = {}
+_output_checksums_lock = threading.Lock()
+
+
+def _load_json_dict(path: str) -> Dict:
+    """Load a JSON object from disk. A missing or unreadable file yields an empty dict."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_json_dict(path: str, data: Dict, description: str) -> None:
+    """Write a JSON object to disk, warning instead of failing on errors."""
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+    except OSError as e:
+        print(f"{Colors.YELLOW}Warning: Could not write {description} {path}: {e}{Colors.RESET}")
+
+
+def load_http_cache(path: str = HTTP_CACHE_FILE) -> None:
+    """Load the HTTP cache from disk. A missing or unreadable cache file is ignored."""
+    data = _load_json_dict(path)
+    with _http_cache_lock:
+        _http_cache.update(data)
+
+
+def save_http_cache(path: str = HTTP_CACHE_FILE) -> None:
+    """Persist the HTTP cache to disk."""
+    with _http_cache_lock:
+        data = dict(_http_cache)
+    _save_json_dict(path, data, 'HTTP cache')
+
+
+def load_output_checksums(path: str = CHECKSUMS_FILE) -> None:
+    """Load the output checksums from disk. A missing or unreadable file is ignored."""
+    data = _load_json_dict(path)
+    with _output_checksums_lock:
+        _output_checksums.update(data)
+
+
+def save_output_checksums(path: str = CHECKSUMS_FILE) -> None:
+    """Persist the output checksums to disk."""
+    with _output_checksums_lock:
+        data = dict(_output_checksums)
+    _save_json_dict(path, data, 'checksums file')
+
+
+def _record_output_checksum(output_path: str, checksum: str) -> None:
+    """Remember the checksum of an up-to-date output file along with its stat info."""
+    st = os.stat(output_path)
+    with _output_checksums_lock:
+        _output_checksums[output_path] = {
+            'sha256': checksum,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+        }
+
+
+def _output_matches_checksum(output_path: str, checksum: str) -> bool:
+    """Check if an output file is known to hold content with the given checksum."""
+    with _output_checksums_lock:
+        known = _output_checksums.get(output_path)
+    if not known or known.get('sha256') != checksum:
+        return False
+    try:
+        st = os.stat(output_path)
+    except OSError:
+        return False
+    return known.get('size') == st.st_size and known.get('mtime_ns') == st.st_mtime_ns
+
 
-def fetch_directory_listing(branch: str, module: str) -> List[str]:
+def _get_connection(scheme: str, netloc: str) -> Tuple[HTTPConnection, bool]:
+    """
+    Get the current thread's connection to a host, creating it if needed.
+    Returns (connection, reused) where reused tells if the connection was used before.
+    """
+    pool = getattr(_http_connections, 'pool', None)
+    if pool is None:
+        pool = _http_connections.pool = {}
+    
+    conn = pool.get((scheme, netloc))
+    if conn is not None:
+        return conn, True
+    
+    connection_class = HTTPSConnection if scheme == 'https' else HTTPConnection
+    conn = pool[(scheme, netloc)] = connection_class(netloc, timeout=HTTP_TIMEOUT)
+    return conn, False
+
+
+def _drop_connection(scheme: str, netloc: str) -> None:
+    """Close and forget the current thread's connection to a host."""
+    conn = _http_connections.pool.pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def _urllib_request(url: str, method: str, headers: Dict[str, str]) -> Tuple[int, str, HTTPMessage, bytes]:
+    """Send an HTTP request with urllib, which honors proxy settings."""
+    try:
+        with urlopen(Request(url, method=method, headers=headers), timeout=HTTP_TIMEOUT) as response:
+            return response.status, response.reason, response.headers, response.read()
+    except HTTPError as e:
+        return e.code, e.reason, e.headers, b''
+
+
+def http_request(url: str, method: str = 'GET', headers: Optional[Dict[str, str]] = None) -> Tuple[int, str, HTTPMessage, bytes]:
+    """
+    Send an HTTP request and return (status, reason, headers, body).
+    The request goes over a kept-alive connection of the current thread and redirects
+    are followed. Error statuses are returned, not raised; network failures raise URLError.
+    If a proxy is configured for the URL scheme, the request is sent with urllib instead.
+    """
+    headers = {'User-Agent': HTTP_USER_AGENT, **(headers or {})}
+    
+    for _ in range(HTTP_MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        if parts.scheme in getproxies():
+            return _urllib_request(url, method, headers)
+        
+        path = f"{parts.path or '/'}?{parts.query}" if parts.query else (parts.path or '/')
+        while True:
+            conn, reused = _get_connection(parts.scheme, parts.netloc)
+            try:
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (HTTPException, OSError) as e:
+                _drop_connection(parts.scheme, parts.netloc)
+                # The server may have closed a kept-alive connection, retry on a new one
+                if not reused:
+                    raise URLError(e)
+        
+        if response.will_close:
+            _drop_connection(parts.scheme, parts.netloc)
+        
+        location = response.getheader('Location')
+        if response.status in (301, 302, 303, 307, 308) and location:
+            url = urljoin(url, location)
+            continue
+        return response.status, response.reason, response.headers, body
+    
+    raise URLError(f"Too many redirects for {url}")
+
+
+def fetch_url(url: str) -> str:
+    """
+    Fetch a URL and return its body as text.
+    If the URL is in the HTTP cache, a conditional GET is sent with If-None-Match and
+    the cached body is reused on 304 Not Modified. Successful responses carrying an
+    ETag are stored in the cache.
+    """
+    with _http_cache_lock:
+        cached = _http_cache.get(url)
+    headers = {'If-None-Match': cached['etag']} if cached else {}
+    
+    status, reason, response_headers, body = http_request(url, headers=headers)
+    if status == 304 and cached:
+        return cached['body']
+    if not 200 <= status < 300:
+        raise HTTPError(url, status, reason, response_headers, None)
+    
+    body = body.decode('utf-8')
+    etag = response_headers.get('ETag')
+    if etag:
+        with _http_cache_lock:
+            _http_cache[url] = {'etag': etag, 'body': body}
+    return body
+
+
+def _run_concurrently(func, args_list: List[Tuple], executor: Optional[ThreadPoolExecutor] = None) -> List[Tuple[any, Optional[Exception]]]:
+    """
+    Call `func(*args)` for every entry of `args_list` concurrently.
+    Returns a list of (result, error) tuples in the order of `args_list`; error is the
+    exception raised by the call, or None.
+    If no executor is given, a temporary pool of up to MAX_FETCH_WORKERS threads is used.
+    """
+    if not args_list:
+        return []
+    
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(args_list)))
+    
+    try:
+        futures = {executor.submit(func, *args): i for i, args in enumerate(args_list)}
+        results = [None] * len(args_list)
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = (future.result(), None)
+            except Exception as e:
+                results[futures[future]] = (None, e)
+        return results
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def remote_file_exists(url: str) -> bool:
+    """Check if a remote file exists with a HEAD request (no body is transferred)."""
+    try:
+        status, _, _, _ = http_request(url, method='HEAD')
+    except URLError:
+        return False
+    return status == 200
+
+
+def fetch_proto_tree(branch: str) -> Dict[str, List[str]]:
+    """
+    Fetch the names of all remote proto files, grouped by module, using a single
+    recursive Git Trees API call: {module: [filename, ...]} for
+    REMOTE_PROTO_PATH/{module}/v1/{filename}.
+    The outcome (listing or error) is memoized per branch for the whole run, so the
+    modules synced concurrently share one API call.
+    """
+    with _proto_trees_lock:
+        if branch not in _proto_trees:
+            try:
+                _proto_trees[branch] = (_fetch_proto_tree(branch), None)
+            except Exception as e:
+                _proto_trees[branch] = (None, e)
+        listing, error = _proto_trees[branch]
+    
+    if error is not None:
+        raise error
+    return listing
+
+
+def _fetch_proto_tree(branch: str) -> Dict[str, List[str]]:
+    """Fetch and group the remote proto file names, see fetch_proto_tree."""
+    api_url = f"https://api.github.com/repos/{GITHUB_REPO}/git/trees/{branch}?recursive=1"
+    data = json.loads(fetch_url(api_url))
+    if data.get('truncated'):
+        raise Exception("Git tree listing is truncated")
+    
+    prefix = f"{REMOTE_PROTO_PATH}/"
+    listing: Dict[str, List[str]] = {}
+    for item in data['tree']:
+        path = item['path']
+        if item.get('type') != 'blob' or not path.startswith(prefix) or not path.endswith('.proto'):
+            continue
+        # {module}/v1/{filename}
+        parts = path[len(prefix):].split('/')
+        if len(parts) == 3 and parts[1] == 'v1':
+            listing.setdefault(parts[0], []).append(parts[2])
+    return listing
+
+
+def fetch_directory_listing(branch: str, module: str, out: Optional[TextIO] = None,
+                            executor: Optional[ThreadPoolExecutor] = None) -> List[str]:
     """
     Fetch the list of proto files in a remote directory using GitHub API.
-    Falls back to a predefined list if API fails.
+    Falls back to probing a predefined list of file names if API fails; the probes
+    are issued concurrently on `executor` if given, otherwise on a temporary pool.
+    Progress messages are written to `out` (defaults to stdout).
     """
     # Try GitHub API first
-    api_url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{REMOTE_PROTO_PATH}/{module}/v1?ref={branch}"
-    
     try:
-        import json
-        with urlopen(api_url) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            proto_files = [item['name'] for item in data if item['name'].endswith('.proto')]
-            return sorted(proto_files)
+        listing = fetch_proto_tree(branch)
+        if module not in listing:
+            raise Exception(f"No proto files found for module '{module}'")
+        return sorted(listing[module])
     except Exception as e:
-        print(f"{Colors.YELLOW}Warning: Could not fetch directory listing via API: {e}{Colors.RESET}")
-        print(f"{Colors.YELLOW}Trying common file names...{Colors.RESET}")
+        print(f"{Colors.YELLOW}Warning: Could not fetch directory listing via API: {e}{Colors.RESET}", file=out)
+        print(f"{Colors.YELLOW}Trying common file names...{Colors.RESET}", file=out)
         
         # Fallback: Try common file names
         common_names = ['rpc.proto', 'write.proto', 'query.proto', 'schema.proto', 
                        'topn.proto', 'model.proto', 'common.proto']
-        found_files = []
-        for filename in common_names:
-            url = f"{GITHUB_RAW_BASE}/{GITHUB_REPO}/{branch}/{REMOTE_PROTO_PATH}/{module}/v1/{filename}"
-            try:
-                with urlopen(url) as response:
-                    if response.status == 200:
-                        found_files.append(filename)
-            except:
-                pass
+        probes = _run_concurrently(remote_file_exists, [
+            (f"{GITHUB_RAW_BASE}/{GITHUB_REPO}/{branch}/{REMOTE_PROTO_PATH}/{module}/v1/{filename}",)
+            for filename in common_names
+        ], executor)
+        found_files = [filename for filename, (exists, _) in zip(common_names, probes) if exists]
         
         if found_files:
             return sorted(found_files)
@@ -160,399 +475,414 @@ def fetch_proto_file(branch: str, module: str, filename: str) -> str:
     url = f"{GITHUB_RAW_BASE}/{GITHUB_REPO}/{branch}/{REMOTE_PROTO_PATH}/{module}/v1/{filename}"
     
     try:
-        with urlopen(url) as response:
-            return response.read().decode('utf-8')
+        return fetch_url(url)
     except URLError as e:
         raise Exception(f"Failed to fetch {url}: {e}")
 
 
-def parse_proto_file(content: str) -> Dict[str, any]:
+def fetch_proto_files(branch: str, module: str, proto_files: List[str],
+                      executor: Optional[ThreadPoolExecutor] = None) -> List[Tuple[str, Optional[str], Optional[Exception]]]:
     """
-    Parse a proto file into structured components.
-    Returns a dict with: license, syntax, java_package, package, imports, body
+    Fetch several proto files of a module concurrently.
+    Returns a list of (filename, content, error) tuples in the order of `proto_files`;
+    exactly one of content/error is set for each entry.
+    If no executor is given, a temporary pool of up to MAX_FETCH_WORKERS threads is used.
     """
-    lines = content.split('\n')
-    result = {
-        'license': [],
-        'syntax': None,
-        'java_package': None,
-        'package': None,
-        'imports': [],
-        'body': []
-    }
+    results = _run_concurrently(fetch_proto_file, [(branch, module, filename) for filename in proto_files], executor)
+    return [(filename, content, error) for filename, (content, error) in zip(proto_files, results)]
+
+
+def _brace_delta(line: str) -> int:
+    """Net number of opening braces on a line (str.count scans run in C)."""
+    return line.count('{') - line.count('}')
+
+
+class ParsedProto(NamedTuple):
+    """Structured components of a proto file. Immutable, so parse results can be cached."""
+    license: Tuple[str, ...]
+    syntax: Optional[str]
+    java_package: Optional[str]
+    package: Optional[str]
+    imports: Tuple[str, ...]
+    body: Tuple[str, ...]
+
+
+class ProtoStreamParser:
+    """
+    Single-pass parser for upstream proto files.
     
-    license_done = False
-    syntax_done = False
-    package_done = False
-    in_http_option = False
-    brace_depth = 0
+    Every line is classified exactly once. Header lines (license, syntax, java_package,
+    package, imports) are collected as they are seen, while body lines are streamed
+    through the body filters in the same pass:
+    - leading and trailing empty lines are dropped
+    - excluded messages and RPCs are removed
+    - option blocks are removed from RPC methods, and RPC blocks that end up empty are
+      collapsed to single-line RPCs
+    - remaining empty {} RPC blocks are collapsed to single-line RPCs
     
-    for i, line in enumerate(lines):
-        stripped = line.strip()
+    Only an RPC block that is still open is buffered, until its end is known.
+    """
+    
+    def __init__(self, exclude_messages: Iterable[str] = (), exclude_rpcs: Iterable[str] = ()):
+        # frozenset() returns frozenset arguments as-is, so callers passing sets pay nothing
+        self.exclude_messages = frozenset(exclude_messages)
+        self.exclude_rpcs = frozenset(exclude_rpcs)
+    
+    def parse(self, content: str) -> ParsedProto:
+        """Parse a proto file into structured components."""
+        license_lines = []
+        syntax = None
+        java_package = None
+        package = None
+        imports = []
+        
+        # Body filter state
+        self._body = []
+        self._body_started = False
+        self._pending_blank_lines = []
+        self._in_excluded_def = False
+        self._excluded_depth = 0
+        self._rpc_line = None
+        self._empty_rpc_line = None
+        self._empty_rpc_blank_lines = []
         
-        # Detect license header - collect all consecutive comment lines from the start
-        if not license_done:
-            # Check if this is a comment line (// or /* */ style)
-            is_comment = (stripped.startswith('//') or 
-                         stripped.startswith('/*') or 
-                         (stripped.startswith('*') and i > 0 and '/*' in lines[i-1]))
+        license_done = False
+        syntax_done = False
+        package_done = False
+        in_http_option = False
+        brace_depth = 0
+        
+        for line in content.split('\n'):
+            stripped = line.strip()
             
-            if is_comment:
-                result['license'].append(line)
+            # Detect license header - collect all consecutive comment lines from the start
+            if not license_done:
+                # Check if this is a comment line (// or /* */ style). Until the license
+                # ends every line is collected, so the previous line is license_lines[-1]
+                is_comment = (stripped.startswith(('//', '/*')) or 
+                             (stripped.startswith('*') and license_lines and '/*' in license_lines[-1]))
+                
+                if is_comment:
+                    license_lines.append(line)
+                    continue
+                elif not stripped:
+                    # Empty line after comments - license is done
+                    license_done = True
+                    continue
+                else:
+                    # Non-comment, non-empty line - license must have ended
+                    license_done = True
+                    # Fall through to process this line
+            
+            # Skip empty lines after license but before syntax
+            if not syntax_done and not stripped:
                 continue
-            elif not stripped:
-                # Empty line after comments - license is done
-                license_done = True
+            
+            match = _LINE_CLASSIFIER.match(stripped)
+            kind = match.lastgroup if match else None
+            
+            # Parse syntax
+            if not syntax_done and kind == 'syntax':
+                syntax = line
+                syntax_done = True
                 continue
-            else:
-                # Non-comment, non-empty line - license must have ended
-                license_done = True
-                # Fall through to process this line
-        
-        # Skip empty lines after license but before syntax
-        if license_done and not syntax_done and not stripped:
-            continue
-        
-        # Parse syntax
-        if not syntax_done and stripped.startswith('syntax ='):
-            result['syntax'] = line
-            syntax_done = True
-            continue
-        
-        # Parse java_package option
-        if stripped.startswith('option java_package'):
-            if not result['java_package']:
-                result['java_package'] = line
-            continue
-        
-        # Skip lines matching line_prefixes patterns
-        if any(stripped.startswith(prefix) for prefix in SKIP_PATTERNS['line_prefixes']):
-            continue
-        
-        # Skip lines matching line_contains patterns
-        if any(pattern in stripped for pattern in SKIP_PATTERNS['line_contains']):
-            continue
-        
-        # Track and skip option blocks (multi-line options requiring brace tracking)
-        # Check if we're starting a new option block (can appear after syntax)
-        if syntax_done:
-            for option_pattern in SKIP_PATTERNS['option_blocks']:
-                if option_pattern in stripped:
-                    # Always skip the line when we detect the pattern
-                    brace_depth = stripped.count('{') - stripped.count('}')
+            
+            # Parse java_package option
+            if kind == 'java_package':
+                if not java_package:
+                    java_package = line
+                continue
+            
+            # Skip lines matching line_prefixes patterns
+            if kind == 'skip_prefix':
+                continue
+            
+            # Skip lines matching line_contains patterns
+            if _SKIP_CONTAINS_RE.search(stripped):
+                continue
+            
+            # Track and skip option blocks (multi-line options requiring brace tracking)
+            if syntax_done:
+                # Check if we're starting a new option block (can appear after syntax)
+                if _OPTION_BLOCK_RE.search(stripped):
+                    brace_depth = _brace_delta(stripped)
                     if brace_depth > 0:
                         # Multi-line option, start tracking
                         in_http_option = True
-                    # For single-line options, brace_depth <= 0, so we just skip and continue
+                
+                if in_http_option:
+                    # We're inside an option block, track braces
+                    brace_depth += _brace_delta(stripped)
+                    if brace_depth <= 0:
+                        # Reached the end of the option block
+                        in_http_option = False
                     continue
             
-            if in_http_option:
-                # We're inside an option block, track braces
-                brace_depth += stripped.count('{') - stripped.count('}')
-                if brace_depth <= 0:
-                    # Reached the end of the option block
-                    in_http_option = False
+            # Parse package declaration
+            if not package_done and kind == 'package':
+                package = line
+                package_done = True
+                continue
+            
+            # Parse imports (skip patterns in import_contains)
+            if kind == 'import':
+                if not _SKIP_IMPORT_RE.search(line):
+                    imports.append(line)
                 continue
+            
+            # Everything else is body
+            if syntax_done and package_done:
+                self._feed_body(line, stripped)
         
-        # Parse package declaration
-        if not package_done and stripped.startswith('package '):
-            result['package'] = line
-            package_done = True
-            continue
+        # An RPC block still open at the end of the file is collapsed to a single line,
+        # and the lines buffered after it are processed again
+        while self._rpc_line is not None:
+            block_lines = self._rpc_block_lines
+            self._close_rpc_block()
+            for block_line, block_stripped in block_lines:
+                self._feed_rpc(block_line, block_stripped)
         
-        # Parse imports (skip patterns in import_contains)
-        if stripped.startswith('import '):
-            if not any(pattern in line for pattern in SKIP_PATTERNS['import_contains']):
-                result['imports'].append(line)
-            continue
+        if self._empty_rpc_line is not None:
+            self._body.append(self._empty_rpc_line)
+            self._body.extend(self._empty_rpc_blank_lines)
         
-        # Everything else is body (skip if we're in an option block being tracked)
-        if syntax_done and package_done and not in_http_option:
-            result['body'].append(line)
-    
-    return result
-
-
-def transform_import_path(import_line: str) -> str:
-    """
-    Transform import paths from old format to new merged format.
-    banyandb/{module}/v1/{file}.proto -> banyandb/v1/banyandb-{module}.proto
-    
-    Example:
-      import "banyandb/common/v1/common.proto"; -> import "banyandb/v1/banyandb-common.proto";
-      import "banyandb/model/v1/query.proto"; -> import "banyandb/v1/banyandb-model.proto";
-    """
-    import re
-    
-    # Pattern to match: banyandb/{module}/v1/{file}.proto
-    # Extract the module name and replace the entire path
-    def replace_import(match):
-        module = match.group(1)
-        return f'banyandb/v1/banyandb-{module}.proto'
-    
-    # Replace the path pattern in the import statement
-    new_line = re.sub(
-        r'banyandb/([^/]+)/v1/[^"]+\.proto',
-        replace_import,
-        import_line
-    )
-    
-    return new_line
-
-
-def filter_excluded_definitions(body_lines: List[str], exclude_messages: List[str], exclude_rpcs: List[str]) -> List[str]:
-    """
-    Filter out excluded messages and RPCs from the body.
-    
-    Args:
-        body_lines: The body lines to filter
-        exclude_messages: List of message names to exclude
-        exclude_rpcs: List of RPC names to exclude
+        return ParsedProto(
+            license=tuple(license_lines),
+            syntax=syntax,
+            java_package=java_package,
+            package=package,
+            imports=tuple(imports),
+            body=tuple(self._body),
+        )
     
-    Returns:
-        Filtered body lines with excluded definitions removed
-    """
-    if not body_lines or (not exclude_messages and not exclude_rpcs):
-        return body_lines
-    
-    result = []
-    i = 0
-    skip_until_close = False
-    brace_depth = 0
-    
-    while i < len(body_lines):
-        line = body_lines[i]
-        stripped = line.strip()
+    def _feed_body(self, line: str, stripped: str) -> None:
+        """Drop leading and trailing empty body lines, pass everything else on."""
+        if not stripped:
+            # Empty lines are held back until a non-empty line follows
+            if self._body_started:
+                self._pending_blank_lines.append(line)
+            return
         
-        # Check if we're currently skipping a definition
-        if skip_until_close:
+        self._body_started = True
+        for blank_line in self._pending_blank_lines:
+            self._feed_definition(blank_line, '')
+        self._pending_blank_lines.clear()
+        self._feed_definition(line, stripped)
+    
+    def _feed_definition(self, line: str, stripped: str) -> None:
+        """Drop lines belonging to excluded messages and RPCs."""
+        if self._in_excluded_def:
             # Track brace depth to know when the definition ends
-            brace_depth += stripped.count('{') - stripped.count('}')
-            
-            if brace_depth <= 0:
+            self._excluded_depth += _brace_delta(stripped)
+            if self._excluded_depth <= 0:
                 # Definition ended, stop skipping
-                skip_until_close = False
-                brace_depth = 0
-            
-            i += 1
-            continue
+                self._in_excluded_def = False
+                self._excluded_depth = 0
+            return
         
         # Check for excluded messages
-        if exclude_messages and stripped.startswith('message '):
-            # Extract message name
-            match = re.match(r'message\s+(\w+)', stripped)
-            if match:
-                message_name = match.group(1)
-                if message_name in exclude_messages:
-                    # Start skipping this message definition
-                    skip_until_close = True
-                    brace_depth = stripped.count('{') - stripped.count('}')
-                    i += 1
-                    continue
+        if self.exclude_messages and stripped.startswith('message '):
+            match = _MESSAGE_RE.match(stripped)
+            if match and match.group(1) in self.exclude_messages:
+                # Start skipping this message definition
+                self._in_excluded_def = True
+                self._excluded_depth = _brace_delta(stripped)
+                return
         
         # Check for excluded RPCs
-        if exclude_rpcs and stripped.startswith('rpc '):
-            # Extract RPC name
-            match = re.match(r'rpc\s+(\w+)', stripped)
-            if match:
-                rpc_name = match.group(1)
-                if rpc_name in exclude_rpcs:
-                    # Check if this is a single-line RPC (ends with ;) or multi-line (has {)
-                    if stripped.endswith(';'):
-                        # Single-line RPC, skip just this line
-                        i += 1
-                        continue
-                    elif '{' in stripped:
-                        # Multi-line RPC, start skipping
-                        skip_until_close = True
-                        brace_depth = stripped.count('{') - stripped.count('}')
-                        i += 1
-                        continue
+        if self.exclude_rpcs and stripped.startswith('rpc '):
+            match = _RPC_RE.match(stripped)
+            if match and match.group(1) in self.exclude_rpcs:
+                if stripped.endswith(';'):
+                    # Single-line RPC, skip just this line
+                    return
+                elif '{' in stripped:
+                    # Multi-line RPC, start skipping
+                    self._in_excluded_def = True
+                    self._excluded_depth = _brace_delta(stripped)
+                    return
         
-        # Keep this line
-        result.append(line)
-        i += 1
+        self._feed_rpc(line, stripped)
     
-    return result
-
-
-def remove_options_from_rpc_blocks(body_lines: List[str]) -> List[str]:
-    """
-    Remove option lines from inside RPC method blocks and convert to single-line RPCs if only options remain.
-    Removes lines matching patterns in SKIP_PATTERNS['option_blocks'] from within RPC definitions.
-    Converts:
-      rpc Query(QueryRequest) returns (QueryResponse) {
-        option (google.api.http) = {...};
-      }
-    to:
-      rpc Query(QueryRequest) returns (QueryResponse);
-    """
-    if not body_lines:
-        return body_lines
-    
-    result = []
-    i = 0
-    while i < len(body_lines):
-        line = body_lines[i]
-        stripped = line.strip()
+    def _feed_rpc(self, line: str, stripped: str) -> None:
+        """
+        Remove option lines matching SKIP_PATTERNS['option_blocks'] from inside RPC method
+        blocks and convert to single-line RPCs if nothing else remains.
+        Converts:
+          rpc Query(QueryRequest) returns (QueryResponse) {
+            option (google.api.http) = {...};
+          }
+        to:
+          rpc Query(QueryRequest) returns (QueryResponse);
+        """
+        if self._rpc_line is None:
+            # Check if this is an RPC line ending with {
+            if 'rpc ' in stripped and stripped.endswith('{'):
+                self._rpc_line = line
+                self._rpc_block_lines = []
+                self._rpc_content = []
+                self._rpc_option_count = 0
+            else:
+                self._feed_empty_rpc(line, stripped)
+            return
         
-        # Check if this is an RPC line ending with {
-        if 'rpc ' in stripped and stripped.endswith('{'):
-            rpc_line = line
-            j = i + 1
-            block_content = []
-            option_count = 0
+        self._rpc_block_lines.append((line, stripped))
+        
+        # Check if we hit another RPC or service/message definition (malformed block)
+        if stripped.startswith(('rpc ', 'service ', 'message ')):
+            # Malformed RPC block (no proper closing brace), convert to single-line
+            # and continue from this line
+            self._close_rpc_block()
+            self._feed_rpc(line, stripped)
+            return
+        
+        # Check if we've reached a closing brace
+        if stripped == '}':
+            # This could be the RPC block's closing brace OR the service's closing brace
+            has_non_empty_content = any(content_line.strip() for content_line in self._rpc_content)
             
-            # Scan through the RPC block and collect non-option lines
-            while j < len(body_lines):
-                block_line = body_lines[j]
-                block_stripped = block_line.strip()
-                
-                # Check if we hit another RPC or service/message definition (malformed block)
-                if (block_stripped.startswith('rpc ') or 
-                    block_stripped.startswith('service ') or 
-                    block_stripped.startswith('message ')):
-                    # Malformed RPC block (no proper closing brace), convert to single-line
-                    rpc_single_line = rpc_line.rstrip().rstrip('{').rstrip()
-                    result.append(rpc_single_line + ';')
-                    # Continue from this line (don't skip it)
-                    i = j
-                    break
-                
-                # Check if we've reached a closing brace
-                if block_stripped == '}':
-                    # This could be the RPC block's closing brace OR the service's closing brace
-                    # If we only found options (and empty lines), it's likely the RPC's closing brace
-                    # If we found no options at all, it might be the service's closing brace (malformed RPC)
-                    
-                    has_non_empty_content = any(line.strip() for line in block_content)
-                    
-                    if option_count > 0 or has_non_empty_content:
-                        # We found content in this block, so this } belongs to the RPC
-                        if has_non_empty_content:
-                            # Keep the block with non-option content
-                            result.append(rpc_line)
-                            result.extend(block_content)
-                            result.append(block_line)
-                        else:
-                            # Only had options (now removed), convert to single-line
-                            rpc_single_line = rpc_line.rstrip().rstrip('{').rstrip()
-                            result.append(rpc_single_line + ';')
-                        i = j + 1
-                    else:
-                        # No options and no content found, this } likely belongs to service (malformed RPC)
-                        rpc_single_line = rpc_line.rstrip().rstrip('{').rstrip()
-                        result.append(rpc_single_line + ';')
-                        # Don't consume the }, continue from it
-                        i = j
-                    break
-                
-                # Check if this line is an option we want to remove
-                is_skip_option = any(pattern in block_stripped for pattern in SKIP_PATTERNS['option_blocks'])
-                
-                if is_skip_option:
-                    option_count += 1
-                else:
-                    # Keep lines that are not skippable options (including empty lines)
-                    block_content.append(block_line)
-                
-                j += 1
+            if has_non_empty_content:
+                # Keep the block with non-option content
+                rpc_line = self._rpc_line
+                self._rpc_line = None
+                self._feed_empty_rpc(rpc_line, rpc_line.strip())
+                for content_line in self._rpc_content:
+                    self._feed_empty_rpc(content_line, content_line.strip())
+                self._feed_empty_rpc(line, stripped)
+            elif self._rpc_option_count > 0:
+                # Only had options (now removed), convert to single-line
+                self._close_rpc_block()
             else:
-                # Reached end of file without closing brace, convert to single-line
-                rpc_single_line = rpc_line.rstrip().rstrip('{').rstrip()
-                result.append(rpc_single_line + ';')
-                i += 1
-            continue
+                # No options and no content found, this } likely belongs to service (malformed RPC)
+                self._close_rpc_block()
+                self._feed_empty_rpc(line, stripped)
+            return
         
-        result.append(line)
-        i += 1
+        # Keep lines that are not skippable options (including empty lines)
+        if _OPTION_BLOCK_RE.search(stripped):
+            self._rpc_option_count += 1
+        else:
+            self._rpc_content.append(line)
+    
+    def _close_rpc_block(self) -> None:
+        """Emit the open RPC as a single-line RPC and drop its buffered block."""
+        rpc_line = self._rpc_line.rstrip().rstrip('{').rstrip() + ';'
+        self._rpc_line = None
+        self._feed_empty_rpc(rpc_line, rpc_line.strip())
     
-    return result
+    def _feed_empty_rpc(self, line: str, stripped: str) -> None:
+        """
+        Remove empty {} blocks from RPC definitions.
+        Converts:
+          rpc Query(QueryRequest) returns (QueryResponse) {
+          }
+        to:
+          rpc Query(QueryRequest) returns (QueryResponse);
+        """
+        if self._empty_rpc_line is not None:
+            # Look ahead, skipping empty lines, to see if the next line is just }
+            if not stripped:
+                self._empty_rpc_blank_lines.append(line)
+                return
+            
+            rpc_line = self._empty_rpc_line
+            self._empty_rpc_line = None
+            if stripped == '}':
+                # Found empty RPC block, drop the { and the }
+                self._body.append(rpc_line.rstrip().rstrip('{').rstrip() + ';')
+                self._empty_rpc_blank_lines.clear()
+                return
+            
+            self._body.append(rpc_line)
+            self._body.extend(self._empty_rpc_blank_lines)
+            self._empty_rpc_blank_lines.clear()
+        
+        # Check if this is an RPC line ending with {
+        if 'rpc ' in stripped and stripped.endswith('{'):
+            self._empty_rpc_line = line
+        else:
+            self._body.append(line)
 
 
-def cleanup_empty_rpc_blocks(body_lines: List[str]) -> List[str]:
+@lru_cache(maxsize=128)
+def parse_proto_file(content: str, exclude_messages: FrozenSet[str] = frozenset(), exclude_rpcs: FrozenSet[str] = frozenset()) -> ParsedProto:
     """
-    Remove empty {} blocks from RPC definitions.
-    Converts:
-      rpc Query(QueryRequest) returns (QueryResponse) {
-      }
-    to:
-      rpc Query(QueryRequest) returns (QueryResponse);
+    Parse a proto file into structured components.
+    The body is already filtered, see ProtoStreamParser.
+    Results are cached by content and exclusions, so unchanged files are parsed once.
     """
-    if not body_lines:
-        return body_lines
-    
-    result = []
-    i = 0
-    while i < len(body_lines):
-        line = body_lines[i]
-        stripped = line.strip()
-        
-        # Check if this is an RPC line ending with {
-        if 'rpc ' in stripped and stripped.endswith('{'):
-            # Look ahead to see if the next non-empty line is just }
-            j = i + 1
-            # Skip empty lines
-            while j < len(body_lines) and not body_lines[j].strip():
-                j += 1
-            
-            if j < len(body_lines) and body_lines[j].strip() == '}':
-                # Found empty RPC block, remove the { and the }
-                # Replace the rpc line to remove the { at the end
-                rpc_line = line.rstrip().rstrip('{').rstrip()
-                result.append(rpc_line + ';')
-                # Skip the closing }
-                i = j + 1
-                continue
-        
-        result.append(line)
-        i += 1
+    return ProtoStreamParser(exclude_messages, exclude_rpcs).parse(content)
+
+
+def transform_import_path(import_line: str) -> str:
+    """
+    Transform import paths from old format to new merged format.
+    banyandb/{module}/v1/{file}.proto -> banyandb/v1/banyandb-{module}.proto
+    
+    Example:
+      import "banyandb/common/v1/common.proto"; -> import "banyandb/v1/banyandb-common.proto";
+      import "banyandb/model/v1/query.proto"; -> import "banyandb/v1/banyandb-model.proto";
+    """
+    # Extract the module name and replace the entire path
+    def replace_import(match):
+        module = match.group(1)
+        return f'banyandb/v1/banyandb-{module}.proto'
+    
+    # Replace the path pattern in the import statement
+    new_line = _IMPORT_PATH_RE.sub(replace_import, import_line)
     
-    return result
+    return new_line
 
 
-def merge_proto_files(proto_contents: List[str], current_module: str = None, exclude_messages: List[str] = None, exclude_rpcs: List[str] = None) -> str:
+def iter_merge_proto(proto_contents: List[str], current_module: str = None, exclude_messages: FrozenSet[str] = None, exclude_rpcs: FrozenSet[str] = None) -> Iterator[str]:
     """
-    Intelligently merge multiple proto files into one.
+    Intelligently merge multiple proto files into one, yielding the merged text in chunks.
     - Keep one license header
     - Keep one syntax declaration
     - Keep one java_package option
     - Keep one package declaration
     - Merge and deduplicate imports
-    - Concatenate all body content
+    - Concatenate all body content, without excluded messages and RPCs
     """
     if not proto_contents:
-        return ""
+        return
     
-    parsed_files = [parse_proto_file(content) for content in proto_contents]
+    exclude_messages = frozenset(exclude_messages or ())
+    exclude_rpcs = frozenset(exclude_rpcs or ())
+    parsed_files = [parse_proto_file(content, exclude_messages, exclude_rpcs) for content in proto_contents]
     
-    # Build the merged content
-    merged = []
+    yield from _strip_trailing_empty_lines(_iter_merged_sections(parsed_files, current_module))
+
+
+def merge_proto_files(proto_contents: List[str], current_module: str = None, exclude_messages: FrozenSet[str] = None, exclude_rpcs: FrozenSet[str] = None) -> str:
+    """Merge multiple proto files into one string, see iter_merge_proto."""
+    return ''.join(iter_merge_proto(proto_contents, current_module, exclude_messages, exclude_rpcs))
+
+
+def _iter_merged_sections(parsed_files: List[ParsedProto], current_module: Optional[str]) -> Iterator[str]:
+    """Yield the sections of the merged file, each ending with a newline."""
+    first = parsed_files[0]
     
     # 1. License header (from first file)
-    if parsed_files[0]['license']:
-        merged.extend(parsed_files[0]['license'])
-        merged.append('')
+    if first.license:
+        yield '\n'.join(first.license) + '\n\n'
     
     # 2. Syntax declaration (from first file)
-    if parsed_files[0]['syntax']:
-        merged.append(parsed_files[0]['syntax'])
-        merged.append('')
+    if first.syntax:
+        yield first.syntax + '\n\n'
     
     # 3. Java package option (from first file)
-    if parsed_files[0]['java_package']:
-        merged.append(parsed_files[0]['java_package'])
-        merged.append('')
+    if first.java_package:
+        yield first.java_package + '\n\n'
     
     # 4. Package declaration (from first file)
-    if parsed_files[0]['package']:
-        merged.append(parsed_files[0]['package'])
-        merged.append('')
+    if first.package:
+        yield first.package + '\n\n'
     
     # 5. Merge, transform, and deduplicate imports
     all_imports: Set[str] = set()
     for parsed in parsed_files:
-        for imp in parsed['imports']:
+        for imp in parsed.imports:
             # Transform the import path to the new merged file format
             transformed_imp = transform_import_path(imp.strip())
             
@@ -563,99 +893,99 @@ def merge_proto_files(proto_contents: List[str], current_module: str = None, exc
             all_imports.add(transformed_imp)
     
     if all_imports:
-        # Sort imports: google first, then validate, then banyandb
-        sorted_imports = sorted(all_imports, key=lambda x: (
-            0 if 'google/' in x else (1 if 'validate/' in x else 2),
-            x
-        ))
-        merged.extend(sorted_imports)
-        merged.append('')
-    
-    # 6. Concatenate bodies
+        # Sort imports: google first, then validate, then banyandb. Partition once and
+        # sort each group, instead of computing a sort key per import.
+        google_imports, validate_imports, other_imports = [], [], []
+        for imp in all_imports:
+            if 'google/' in imp:
+                google_imports.append(imp)
+            elif 'validate/' in imp:
+                validate_imports.append(imp)
+            else:
+                other_imports.append(imp)
+        google_imports.sort()
+        validate_imports.sort()
+        other_imports.sort()
+        yield '\n'.join(google_imports + validate_imports + other_imports) + '\n\n'
+    
+    # 6. Concatenate bodies (already trimmed and filtered by the parser)
     for i, parsed in enumerate(parsed_files):
-        if parsed['body']:
-            # Remove leading empty lines from body
-            body_lines = parsed['body']
-            while body_lines and not body_lines[0].strip():
-                body_lines.pop(0)
-            
-            # Remove trailing empty lines from body
-            while body_lines and not body_lines[-1].strip():
-                body_lines.pop()
-            
-            # Filter out patterns defined in SKIP_PATTERNS (secondary filter for body content)
-            body_lines = [line for line in body_lines 
-                         if not any(line.strip().startswith(prefix) for prefix in SKIP_PATTERNS['line_prefixes'])
-                         and not any(pattern in line.strip() for pattern in SKIP_PATTERNS['line_contains'])]
-            
-            # Filter out excluded messages and RPCs
-            if exclude_messages or exclude_rpcs:
-                body_lines = filter_excluded_definitions(
-                    body_lines, 
-                    exclude_messages or [], 
-                    exclude_rpcs or []
-                )
-            
-            # Remove option blocks from inside RPC methods
-            body_lines = remove_options_from_rpc_blocks(body_lines)
-            
-            # Clean up empty RPC blocks
-            body_lines = cleanup_empty_rpc_blocks(body_lines)
-            
-            if body_lines:
-                if i > 0:
-                    # Add separator between files
-                    merged.append('')
-                merged.extend(body_lines)
+        if parsed.body:
+            # Add separator between files
+            separator = '\n' if i > 0 else ''
+            yield separator + '\n'.join(parsed.body) + '\n'
+
+
+def _strip_trailing_empty_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Pass newline-terminated text chunks through, dropping the empty (whitespace-only)
+    lines at the end of the text. The text always ends with a single newline.
+    """
+    # Chunk holding the last non-whitespace character seen so far, and the
+    # whitespace-only chunks that followed it
+    last_chunk = None
+    blank_chunks = []
+    
+    for chunk in chunks:
+        if not chunk or chunk.isspace():
+            blank_chunks.append(chunk)
+            continue
+        if last_chunk is not None:
+            yield last_chunk
+        yield from blank_chunks
+        blank_chunks.clear()
+        last_chunk = chunk
     
-    # Remove trailing empty lines
-    while merged and not merged[-1].strip():
-        merged.pop()
+    if last_chunk is None:
+        yield '\n'
+        return
     
-    # Ensure file ends with newline
-    return '\n'.join(merged) + '\n'
+    # Cut after the line holding the last non-whitespace character
+    content_end = len(last_chunk.rstrip())
+    yield last_chunk[:last_chunk.index('\n', content_end) + 1]
 
 
-def sync_module(branch: str, module: str, config: Dict, dry_run: bool = False) -> Tuple[bool, str]:
+def sync_module(branch: str, module: str, config: Dict, dry_run: bool = False,
+                out: Optional[TextIO] = None, executor: Optional[ThreadPoolExecutor] = None) -> Tuple[bool, str]:
     """
     Sync a single module.
+    Progress messages are written to `out` (defaults to stdout). Proto files are
+    fetched concurrently on `executor` if given, otherwise on a temporary pool.
     Returns (changed, message) tuple.
     """
-    print(f"{Colors.CYAN}Processing module: {module}{Colors.RESET}")
+    print(f"{Colors.CYAN}Processing module: {module}{Colors.RESET}", file=out)
     
     # Determine which files to fetch
     if config['files'] == 'all':
         try:
-            proto_files = fetch_directory_listing(branch, module)
+            proto_files = fetch_directory_listing(branch, module, out, executor)
         except Exception as e:
             return False, f"{Colors.RED}Error: {e}{Colors.RESET}"
     else:
         proto_files = config['files']
     
-    print(f"  Files to sync: {', '.join(proto_files)}")
+    print(f"  Files to sync: {', '.join(proto_files)}", file=out)
     
-    # Fetch all proto files
+    # Fetch all proto files concurrently, reporting results in the original order
     fetched_contents = []
-    for filename in proto_files:
-        try:
-            print(f"  Fetching {filename}...", end=' ')
-            content = fetch_proto_file(branch, module, filename)
-            fetched_contents.append(content)
-            print(f"{Colors.GREEN}✓{Colors.RESET}")
-        except Exception as e:
-            print(f"{Colors.RED}✗{Colors.RESET}")
-            return False, f"{Colors.RED}Error fetching {filename}: {e}{Colors.RESET}"
+    for filename, content, error in fetch_proto_files(branch, module, proto_files, executor):
+        print(f"  Fetching {filename}...", end=' ', file=out)
+        if error is not None:
+            print(f"{Colors.RED}✗{Colors.RESET}", file=out)
+            return False, f"{Colors.RED}Error fetching {filename}: {error}{Colors.RESET}"
+        fetched_contents.append(content)
+        print(f"{Colors.GREEN}✓{Colors.RESET}", file=out)
     
-    # Get exclusion lists for this module
+    # Get exclusion sets for this module (frozensets for O(1) membership tests)
     exclude_config = EXCLUDE_LIST.get(module, {})
-    exclude_messages = exclude_config.get('messages', [])
-    exclude_rpcs = exclude_config.get('rpcs', [])
+    exclude_messages = frozenset(exclude_config.get('messages', []))
+    exclude_rpcs = frozenset(exclude_config.get('rpcs', []))
     
     if exclude_messages or exclude_rpcs:
-        print(f"  Applying exclusions: {len(exclude_messages)} messages, {len(exclude_rpcs)} RPCs")
+        print(f"  Applying exclusions: {len(exclude_messages)} messages, {len(exclude_rpcs)} RPCs", file=out)
     
     # Merge proto files
-    print(f"  Merging {len(fetched_contents)} files...")
+    print(f"  Merging {len(fetched_contents)} files...", file=out)
     merged_content = merge_proto_files(
         fetched_contents, 
         current_module=module,
@@ -666,31 +996,44 @@ def sync_module(branch: str, module: str, config: Dict, dry_run: bool = False) -
     # Determine output path
     output_path = f"proto/banyandb/v1/banyandb-{module}.proto"
     
-    # Check if file exists and compare
+    # Check if file exists and compare. If the merged content hashes to the checksum
+    # recorded by the last sync and the file is untouched, it is not read at all.
+    checksum = hashlib.sha256(merged_content.encode('utf-8')).hexdigest()
     file_exists = os.path.exists(output_path)
     changed = False
     
     if file_exists:
-        with open(output_path, 'r', encoding='utf-8') as f:
-            existing_content = f.read()
-        changed = existing_content != merged_content
+        if not _output_matches_checksum(output_path, checksum):
+            with open(output_path, 'r', encoding='utf-8') as f:
+                existing_content = f.read()
+            changed = existing_content != merged_content
     else:
         changed = True
     
     if changed:
-        print(f"  {Colors.YELLOW}Changes detected{Colors.RESET}")
+        print(f"  {Colors.YELLOW}Changes detected{Colors.RESET}", file=out)
         
         if not dry_run:
-            # Write the merged file
+            # Write the merged file to a temporary file and atomically move it into place,
+            # so an interrupted sync never leaves a half-written proto file behind
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(merged_content)
+            tmp_path = output_path + '.tmp'
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(merged_content)
+                os.replace(tmp_path, output_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            _record_output_checksum(output_path, checksum)
             status = "updated" if file_exists else "created"
-            print(f"  {Colors.GREEN}✓ File {status}: {output_path}{Colors.RESET}")
+            print(f"  {Colors.GREEN}✓ File {status}: {output_path}{Colors.RESET}", file=out)
         else:
-            print(f"  {Colors.BLUE}[DRY RUN] Would update: {output_path}{Colors.RESET}")
+            print(f"  {Colors.BLUE}[DRY RUN] Would update: {output_path}{Colors.RESET}", file=out)
     else:
-        print(f"  {Colors.GREEN}✓ No changes needed{Colors.RESET}")
+        _record_output_checksum(output_path, checksum)
+        print(f"  {Colors.GREEN}✓ No changes needed{Colors.RESET}", file=out)
     
     return changed, output_path
 
@@ -719,6 +1062,11 @@ def main():
         action='store_true',
         help='Skip confirmation prompts'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore and do not update the local HTTP cache and output checksums'
+    )
     
     args = parser.parse_args()
     
@@ -747,12 +1095,32 @@ def main():
             sys.exit(0)
         print()
     
-    # Sync each module
+    if not args.no_cache:
+        load_http_cache()
+        load_output_checksums()
+    
+    # Sync all modules concurrently. Each module logs into its own buffer, which is
+    # printed in module order; all HTTP fetches share one bounded pool.
     results = []
-    for module, config in modules_to_sync.items():
-        changed, message = sync_module(args.branch, module, config, args.dry_run)
-        results.append((module, changed, message))
-        print()
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as fetch_executor, \
+            ThreadPoolExecutor(max_workers=len(modules_to_sync)) as module_executor:
+        futures = []
+        for module, config in modules_to_sync.items():
+            out = io.StringIO()
+            future = module_executor.submit(
+                sync_module, args.branch, module, config, args.dry_run, out, fetch_executor
+            )
+            futures.append((module, out, future))
+        
+        for module, out, future in futures:
+            changed, message = future.result()
+            print(out.getvalue(), end='')
+            results.append((module, changed, message))
+            print()
+    
+    if not args.no_cache:
+        save_http_cache()
+        save_output_checksums()
     
     # Summary
     print(f"{Colors.BOLD}=== Summary ==={Colors.RESET}")